@@ -2,44 +2,97 @@
 
 """Crawling configuration"""
 
+from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
+from typing import Optional
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
+
+
+# Environment
+@dataclass(frozen=True)
+class CrawlConfig:
+    """Settings read from the environment."""
+    headers: dict
+    base_data_dir: str
+    log_base_dir: str
+    max_categories: Optional[int]
+    max_articles: Optional[int]
+    skip_old_articles: bool
+    quiet: bool
+
+
+def _getenv_int(name, default):
+    """Read integer env var; 'None' means no limit."""
+    value = os.getenv(name, '').strip()
+    if not value:
+        return default
+    if value.lower() == 'none':
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer or None, got {value!r}")
+
+
+@lru_cache(maxsize=1)
+def load_config():
+    """Read and validate environment settings once."""
+    return CrawlConfig(
+        headers={
+            'User-Agent': os.getenv('CRAWL_USER_AGENT', 'Mozilla/5.0'),
+            'Accept': os.getenv('CRAWL_ACCEPT'),
+            'Accept-Language': os.getenv('CRAWL_ACCEPT_LANGUAGE'),
+            'Connection': 'keep-alive'
+        },
+        base_data_dir=os.getenv('DATA_RAW_DIR', 'data/raw'),
+        log_base_dir=os.getenv('LOGS_DIR', 'logs') + '/crawling',
+        max_categories=_getenv_int('CRAWL_MAX_CATEGORIES', 10),
+        max_articles=_getenv_int('CRAWL_MAX_ARTICLES', 20),
+        # Only fetch articles whose listing date is today (undated ones are kept)
+        skip_old_articles=os.getenv('CRAWL_SKIP_OLD_ARTICLES', 'false').lower() == 'true',
+        # Suppress per-article console progress (log file still records saves)
+        quiet=os.getenv('CRAWL_QUIET', 'false').lower() == 'true'
+    )
+
+
+CONFIG = load_config()
+
 # URLs
 URL = "https://baochinhphu.vn"
 
-HEADERS = {
-    'User-Agent': os.getenv('CRAWL_USER_AGENT', 'Mozilla/5.0'),
-    'Accept': os.getenv('CRAWL_ACCEPT'),
-    'Accept-Language': os.getenv('CRAWL_ACCEPT_LANGUAGE'),
-    'Connection': 'keep-alive'
-}
-
 # Timing
-DELAY_BETWEEN_REQUESTS = 1
-DELAY_BETWEEN_SUBCATEGORIES = 2
 DELAY_BETWEEN_CATEGORIES = 3
 REQUEST_TIMEOUT = 15
 MAX_RETRIES = 3
-RETRY_DELAY = 5
+RETRY_BASE_DELAY = 1
+RETRY_MAX_DELAY = 30
+
+# Concurrency
+MAX_WORKERS = 8
+REQUESTS_PER_SECOND = 2
+POOL_MAXSIZE = 32
 
 # Paths
-BASE_DATA_DIR = os.getenv('DATA_RAW_DIR', 'data/raw')
-LOG_BASE_DIR = os.getenv('LOGS_DIR', 'logs') + '/crawling'
+SEEN_DB_FILE = f"{CONFIG.base_data_dir}/seen.db"
 DATE_FORMAT = '%Y-%m-%d'
 
 def get_today():
     return datetime.now().strftime(DATE_FORMAT)
 
-OUTPUT_DIR = f"{BASE_DATA_DIR}/{get_today()}"
-LOG_DIR = f"{LOG_BASE_DIR}/{get_today()}"
+def output_dir(date=None):
+    """Raw data directory for a crawl date (default: today)."""
+    return f"{CONFIG.base_data_dir}/{date or get_today()}"
+
+def log_dir(date=None):
+    """Log directory for a crawl date (default: today)."""
+    return f"{CONFIG.log_base_dir}/{date or get_today()}"
 
 # Limits
-DEFAULT_MAX_CATEGORIES = int(os.getenv('CRAWL_MAX_CATEGORIES', 10))
 DEFAULT_MAX_SUBCATEGORIES = 5
-DEFAULT_MAX_ARTICLES = int(os.getenv('CRAWL_MAX_ARTICLES', 20))
 
 # Directory structure
 ARTICLE_DIR = 'article'
@@ -5,24 +5,28 @@ import time
 import argparse
 from pathlib import Path
 
-from src.crawling.config import *
+from src.crawling.config import (
+    CONFIG, output_dir, log_dir, SEEN_DB_FILE, DELAY_BETWEEN_CATEGORIES,
+    DEFAULT_MAX_SUBCATEGORIES, get_today
+)
 from src.crawling.utils import setup_logging, print_separator, print_progress
-from src.crawling.storage import ArticleStorage
+from src.crawling.storage import ArticleStorage, SeenUrlStore
 from src.crawling.scraper import NewsScraper
 
 
 def main(max_categories=None, max_subcategories=None, max_articles=None):
     """Main crawler function."""
     
+    crawl_date = get_today()
+    output_path = output_dir(crawl_date)
+    
     # Setup logging
-    logger = setup_logging(LOG_DIR)
+    logger = setup_logging(log_dir(crawl_date))
     
     # Config
-    max_categories = max_categories or DEFAULT_MAX_CATEGORIES
+    max_categories = max_categories or CONFIG.max_categories
     max_subcategories = max_subcategories or DEFAULT_MAX_SUBCATEGORIES
-    max_articles = max_articles or DEFAULT_MAX_ARTICLES
-    
-    crawl_date = get_today()
+    max_articles = max_articles or CONFIG.max_articles
     
     print_separator()
     print(f"📅 NGÀY CRAWL: {crawl_date}")
@@ -31,13 +35,17 @@ def main(max_categories=None, max_subcategories=None, max_articles=None):
     print(f"  - Max categories: {max_categories}")
     print(f"  - Max subcategories: {max_subcategories}")
     print(f"  - Max articles: {max_articles}")
-    print(f"  - Output: {OUTPUT_DIR}")
+    print(f"  - Output: {output_path}")
     print_separator()
     
+    storage = None
+    scraper = None
+    seen_urls = None
     try:
         # Initialize
-        storage = ArticleStorage(OUTPUT_DIR)
-        scraper = NewsScraper(storage)
+        storage = ArticleStorage(output_path)
+        seen_urls = SeenUrlStore(SEEN_DB_FILE)
+        scraper = NewsScraper(storage, seen_urls)
         
         # Get categories
         categories = scraper.get_main_categories()
@@ -71,13 +79,20 @@ def main(max_categories=None, max_subcategories=None, max_articles=None):
         print(f"✓ Đã crawl {total_stats['categories']} chuyên mục")
         print(f"✓ Đã crawl {total_stats['subcategories']} chuyên mục con")
         print(f"✓ Đã lưu {total_stats['articles']} bài báo")
-        print(f"✓ Dữ liệu: {OUTPUT_DIR}")
+        print(f"✓ Dữ liệu: {output_path}")
         print_separator()
         
     except Exception as e:
         logger.critical(f"Critical error: {e}", exc_info=True)
         print(f"\n✗ LỖI: {e}")
         sys.exit(1)
+    finally:
+        if scraper:
+            scraper.close()
+        if seen_urls:
+            seen_urls.close()
+        if storage:
+            storage.flush()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,20 +1,68 @@
 """Web scraper with multi-selector support"""
 
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup, SoupStrainer
+import soupsieve as sv
+import lxml.html
+from lxml import etree
+import io
 import re
 import time
+import random
 import logging
+from datetime import datetime, date, timezone
+from email.utils import parsedate_to_datetime
 from functools import wraps
+from concurrent.futures import ThreadPoolExecutor
 
-from src.crawling.config import *
-from src.crawling.utils import normalize_url, print_progress, extract_date_from_text
+from src.crawling.config import (
+    CONFIG, URL, REQUEST_TIMEOUT, MAX_RETRIES, RETRY_BASE_DELAY, RETRY_MAX_DELAY,
+    MAX_WORKERS, REQUESTS_PER_SECOND, POOL_MAXSIZE, EXCLUDED_CATEGORIES
+)
+from src.crawling.utils import normalize_url, print_progress, extract_date_from_text, RateLimiter
 
 logger = logging.getLogger(__name__)
 
+# Precompiled patterns
+_HTM_HREF = re.compile(r'\.htm$')
+_WHITESPACE_RE = re.compile(r'\s+')
+_LISTING_CLASS_RE = re.compile(r'box-category|box-stream|timeline_list')
+_ARTICLE_CLASS_RE = re.compile(r'(?<![\w-])(detail-content|detail-time|detail-image|time)(?![\w-])')
 
-def retry(max_attempts=3, delay=5):
-    """Retry decorator."""
+# Keywords marking captions / non-author bylines
+_CAPTION_RE = re.compile(r'(ảnh|nguồn|hình):', re.IGNORECASE)
+_INVALID_AUTHOR_RE = re.compile(r'nguồn|ảnh|theo|tham khảo|xem thêm|liên hệ', re.IGNORECASE)
+
+
+def _is_retryable(error):
+    """Client errors (4xx) will not succeed on retry, except 429 Too Many Requests."""
+    if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+        status = error.response.status_code
+        return status == 429 or not 400 <= status < 500
+    return True
+
+
+def _retry_after(error):
+    """Seconds to wait from a Retry-After header (delta or HTTP date), if any."""
+    response = getattr(error, 'response', None)
+    value = response.headers.get('Retry-After') if response is not None else None
+    if not value:
+        return None
+    
+    if value.strip().isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def retry(max_attempts=3, base_delay=1.0, max_delay=30.0, jitter=0.5):
+    """Retry decorator with exponential backoff and jitter."""
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
@@ -22,11 +70,19 @@ def retry(max_attempts=3, delay=5):
                 try:
                     return func(*args, **kwargs)
                 except Exception as e:
-                    if attempt == max_attempts:
-                        logger.error(f"{func.__name__} failed after {max_attempts} attempts: {e}")
+                    if attempt == max_attempts or not _is_retryable(e):
+                        logger.error("%s failed after %d attempts: %s", func.__name__, attempt, e)
                         raise
-                    logger.warning(f"Attempt {attempt}/{max_attempts} failed. Retrying in {delay}s...")
-                    time.sleep(delay)
+                    backoff = min(max_delay, base_delay * (2 ** (attempt - 1)))
+                    sleep_for = backoff * (1 + random.random() * jitter)
+                    
+                    # Server-requested wait takes precedence over our backoff,
+                    # bounded so one response cannot park a worker for hours
+                    retry_after = _retry_after(e)
+                    if retry_after is not None:
+                        sleep_for = max(sleep_for, min(retry_after, max_delay))
+                    logger.warning("Attempt %d/%d failed. Retrying in %.1fs...", attempt, max_attempts, sleep_for)
+                    time.sleep(sleep_for)
         return wrapper
     return decorator
 
@@ -34,10 +90,20 @@ def retry(max_attempts=3, delay=5):
 class NewsScraper:
     """News scraper with multi-selector fallback."""
     
-    def __init__(self, storage):
+    def __init__(self, storage, seen_urls=None):
         self.storage = storage
+        self.seen_urls = seen_urls
         self.session = requests.Session()
-        self.session.headers.update(HEADERS)
+        self.session.headers.update(CONFIG.headers)
+        
+        # Keep-alive pool large enough for all workers; retries live in @retry
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE, pool_block=False, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        # Concurrent fetching with per-host politeness
+        self.executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+        self.rate_limiter = RateLimiter(REQUESTS_PER_SECOND)
         
         # Multi-selector definitions
         self.thumbnail_selectors = [
@@ -60,49 +126,104 @@ class NewsScraper:
             'div.time'
         ]
         
+        # Compile selectors and patterns once instead of per call; each
+        # fallback list becomes one selector matched in document order
+        self._thumbnail_sel = sv.compile(', '.join(self.thumbnail_selectors))
+        self._sapo_sel = sv.compile(', '.join(self.sapo_selectors))
+        self._time_sel = sv.compile(', '.join(self.time_selectors))
+        self._container_sel = sv.compile('div[class*="box-category"], div[class*="box-stream"], div.timeline_list > div')
+        # Article timestamp: detail-time first, span.time only as fallback
+        self._detail_time_sel = sv.compile('div.detail-time')
+        self._time_fallback_sel = sv.compile('span.time')
+        
+        # Only build the parts of listing/article pages we read
+        self._listing_strainer = SoupStrainer('div', class_=_LISTING_CLASS_RE)
+        self._article_strainer = SoupStrainer(['div', 'span'], class_=_ARTICLE_CLASS_RE)
+        
+        # XPath for read-only navigation pages (no BeautifulSoup tree needed)
+        self._menu_items_xp = etree.XPath(
+            "(//div[contains(concat(' ', normalize-space(@class), ' '), ' header__menu ')])[1]/descendant::ul[1]/li"
+        )
+        self._nav_link_xp = etree.XPath(".//a[contains(concat(' ', normalize-space(@class), ' '), ' nav-link ')]")
+        self._first_link_xp = etree.XPath("(.//a)[1]")
+        self._breadcrumb_items_xp = etree.XPath(
+            "(//div[contains(concat(' ', normalize-space(@class), ' '), ' list__breadcrumb ')])[1]//li"
+        )
+        
         logger.info("NewsScraper initialized")
     
-    @retry(max_attempts=MAX_RETRIES, delay=RETRY_DELAY)
-    def _make_request(self, url):
-        """Make HTTP request with retry."""
+    def close(self):
+        """Shut down worker threads and HTTP session."""
+        self.executor.shutdown(wait=True)
+        self.session.close()
+    
+    @retry(max_attempts=MAX_RETRIES, base_delay=RETRY_BASE_DELAY, max_delay=RETRY_MAX_DELAY)
+    def _fetch(self, url):
+        """Make rate-limited HTTP request with retry."""
+        self.rate_limiter.acquire()
         response = self.session.get(url, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
-        return BeautifulSoup(response.content, 'html.parser')
+        return response
     
-    def _extract_with_fallback(self, element, selectors, is_image=False):
-        """Extract content using multiple selectors."""
-        for selector in selectors:
-            try:
-                found = element.select_one(selector)
-                if found:
-                    if is_image:
-                        content = found.get('src') or found.get('data-src')
-                        if content:
-                            return normalize_url(content, URL)
-                    else:
-                        text = found.get_text(separator=' ', strip=True)
-                        return ' '.join(text.split()) if text else None
-            except:
-                continue
-        return None
+    @staticmethod
+    def _declared_encoding(response):
+        """Charset from Content-Type header, or None to let the parser detect it."""
+        content_type = response.headers.get('Content-Type', '').lower()
+        return response.encoding if 'charset=' in content_type else None
+    
+    def _make_request(self, url, parse_only=None):
+        """Fetch page as BeautifulSoup, optionally restricted by a SoupStrainer."""
+        response = self._fetch(url)
+        return BeautifulSoup(
+            response.content, 'lxml',
+            from_encoding=self._declared_encoding(response),
+            parse_only=parse_only
+        )
+    
+    def _make_tree(self, url):
+        """Fetch page as lxml tree for XPath lookups."""
+        response = self._fetch(url)
+        parser = lxml.html.HTMLParser(encoding=self._declared_encoding(response))
+        return lxml.html.document_fromstring(response.content, parser=parser)
+    
+    @staticmethod
+    def _node_text(node):
+        """lxml equivalent of BS4 get_text(strip=True)."""
+        return ''.join(text.strip() for text in node.itertext())
+    
+    def _clean(self, element):
+        """Get element text with whitespace collapsed in one pass."""
+        return _WHITESPACE_RE.sub(' ', element.get_text(' ', strip=True)).strip()
+    
+    def _extract_with_fallback(self, element, selector, is_image=False):
+        """Extract content using a combined fallback selector (one traversal)."""
+        try:
+            if is_image:
+                for img in selector.iselect(element):
+                    content = img.get('src') or img.get('data-src')
+                    if content:
+                        return normalize_url(content, URL)
+                return None
+            
+            found = selector.select_one(element)
+            if not found:
+                return None
+            return self._clean(found) or None
+        except Exception:
+            return None
     
     def get_main_categories(self):
         """Get main categories."""
         print_progress("Đang lấy danh sách chuyên mục chính...")
         
-        soup = self._make_request(URL)
-        main_menu = soup.find('div', class_='header__menu')
-        
-        if not main_menu:
-            return []
-        
+        tree = self._make_tree(URL)
         categories = []
-        menu_items = main_menu.find('ul').find_all('li', recursive=False)
         
-        for li in menu_items:
-            anchor = li.find('a', class_='nav-link') or li.find('a')
-            if anchor:
-                title = anchor.get_text(strip=True)
+        for li in self._menu_items_xp(tree):
+            anchors = self._nav_link_xp(li) or self._first_link_xp(li)
+            if anchors:
+                anchor = anchors[0]
+                title = self._node_text(anchor)
                 link = anchor.get('href')
                 
                 if title and link and title.lower() not in EXCLUDED_CATEGORIES:
@@ -116,19 +237,15 @@ class NewsScraper:
     
     def get_subcategories(self, category_url):
         """Get subcategories from breadcrumb."""
-        soup = self._make_request(category_url)
-        breadcrumb = soup.find('div', class_='list__breadcrumb')
-        
-        if not breadcrumb:
-            return []
-        
+        tree = self._make_tree(category_url)
         subcategories = []
         seen = set()
         
-        for li in breadcrumb.find_all('li'):
-            anchor = li.find('a')
-            if anchor:
-                title = anchor.get_text(strip=True)
+        for li in self._breadcrumb_items_xp(tree):
+            anchors = self._first_link_xp(li)
+            if anchors:
+                anchor = anchors[0]
+                title = self._node_text(anchor)
                 link = anchor.get('href')
                 
                 if title and link and link not in ['/', category_url]:
@@ -141,36 +258,36 @@ class NewsScraper:
     
     def get_articles_from_page(self, page_url, max_articles=10):
         """Get articles with metadata using multi-selector."""
-        soup = self._make_request(page_url)
+        soup = self._make_request(page_url, parse_only=self._listing_strainer)
         articles = []
         seen = set()
         
         # Find article containers
-        containers = soup.select('div[class*="box-category"], div[class*="box-stream"], div.timeline_list > div')
+        containers = self._container_sel.select(soup, limit=max_articles * 2 if max_articles else 0)
         
-        for box in containers[:max_articles * 2]:
+        for box in containers:
             try:
-                link_tag = box.find('a', href=re.compile(r'\.htm$'))
+                link_tag = box.find('a', href=_HTM_HREF)
                 if not link_tag:
                     continue
                 
-                # Title
-                title_tag = box.find(['h2', 'h3']) or link_tag
-                title = title_tag.get_text(separator=' ', strip=True)
-                title = ' '.join(title.split())
-                
-                # URL
+                # URL first: skip duplicates before extracting any text
                 link = normalize_url(link_tag.get('href'), URL)
+                if not link or link in seen:
+                    continue
                 
-                if not title or not link or link in seen:
+                # Title
+                title_tag = box.find(['h2', 'h3']) or link_tag
+                title = self._clean(title_tag)
+                if not title:
                     continue
                 
                 seen.add(link)
                 
                 # Extract metadata with fallback
-                thumbnail = self._extract_with_fallback(box, self.thumbnail_selectors, is_image=True)
-                sapo = self._extract_with_fallback(box, self.sapo_selectors)
-                published_time = self._extract_with_fallback(box, self.time_selectors)
+                thumbnail = self._extract_with_fallback(box, self._thumbnail_sel, is_image=True)
+                sapo = self._extract_with_fallback(box, self._sapo_sel)
+                published_time = self._extract_with_fallback(box, self._time_sel)
                 
                 articles.append({
                     'title': title,
@@ -180,11 +297,11 @@ class NewsScraper:
                     'published_time': published_time
                 })
                 
-                if len(articles) >= max_articles:
+                if max_articles and len(articles) >= max_articles:
                     break
                     
             except Exception as e:
-                logger.warning(f"Error extracting article: {e}")
+                logger.warning("Error extracting article: %s", e)
                 continue
         
         print_progress(f"✓ Tìm thấy {len(articles)} bài báo", level=3)
@@ -192,7 +309,7 @@ class NewsScraper:
     
     def get_article_content(self, article_url):
         """Get article full content and metadata."""
-        soup = self._make_request(article_url)
+        soup = self._make_request(article_url, parse_only=self._article_strainer)
         content_div = soup.find('div', class_='detail-content')
         
         if not content_div:
@@ -214,23 +331,24 @@ class NewsScraper:
             last_p = paragraphs[-1]
             b_tag = last_p.find('b')
             if b_tag:
-                author_text = b_tag.get_text(separator=' ', strip=True)
-                if len(author_text) < 50 and not any(kw in author_text.lower() for kw in ['nguồn', 'ảnh', 'theo']):
+                author_text = self._clean(b_tag)
+                if len(author_text) < 50 and not _INVALID_AUTHOR_RE.search(author_text):
                     author = author_text
                     paragraphs = paragraphs[:-1]
         
         # Build content
-        content_parts = []
+        content = io.StringIO()
         for p in paragraphs:
-            text = p.get_text(separator=' ', strip=True)
-            text = ' '.join(text.split())
+            text = self._clean(p)
             
             # Filter image captions
             if text and len(text) > 20:
-                if not any(kw in text.lower()[:50] for kw in ['ảnh:', 'nguồn:', 'hình:']):
-                    content_parts.append(text)
+                if not _CAPTION_RE.search(text, 0, 50):
+                    if content.tell():
+                        content.write('\n')
+                    content.write(text)
         
-        main_content = '\n'.join(content_parts)
+        main_content = content.getvalue()
         
         # Extract metadata
         metadata = {
@@ -241,7 +359,7 @@ class NewsScraper:
         }
         
         # Date
-        detail_time = soup.find('div', class_='detail-time') or soup.find('span', class_='time')
+        detail_time = self._detail_time_sel.select_one(soup) or self._time_fallback_sel.select_one(soup)
         if detail_time:
             date_text = detail_time.get_text(separator=' ', strip=True)
             metadata['date'] = extract_date_from_text(date_text)
@@ -254,6 +372,56 @@ class NewsScraper:
         
         return main_content, metadata
     
+    def _is_new(self, published_time):
+        """Check listing date is today; unparseable dates count as new."""
+        date_text = extract_date_from_text(published_time)
+        if not date_text:
+            return True
+        
+        try:
+            published = datetime.strptime(date_text, '%d/%m/%Y').date()
+        except ValueError:
+            return True
+        
+        return published >= date.today()
+    
+    def _fetch_article(self, article):
+        """Fetch article content (runs in a worker thread)."""
+        return self.get_article_content(article['link'])
+    
+    def _crawl_articles(self, tasks, category):
+        """Fetch scheduled (article, subcategory) tasks concurrently and save them in order."""
+        if CONFIG.skip_old_articles:
+            tasks = [t for t in tasks if self._is_new(t[0]['published_time'])]
+        if self.seen_urls is not None:
+            tasks = [t for t in tasks if not self.seen_urls.contains(t[0]['link'])]
+        
+        pending = []
+        results = self.executor.map(self._fetch_article, [article for article, _ in tasks])
+        
+        try:
+            for idx, ((article, subcategory), (content, metadata)) in enumerate(zip(tasks, results), 1):
+                print_progress(f"📄 Bài {idx}/{len(tasks)}: {article['title'][:50]}...", level=2)
+                
+                if content:
+                    pending.append({
+                        'article_content': content,
+                        'title': article['title'],
+                        'url': article['link'],
+                        'metadata': {**metadata, **article},
+                        'category': category,
+                        'subcategory': subcategory
+                    })
+        finally:
+            # Write the whole category in one batch, even if a fetch failed
+            saved = self.storage.save_batch(pending)
+            saved_urls = [item['url'] for item, success in zip(pending, saved) if success]
+            
+            if self.seen_urls is not None:
+                self.seen_urls.add_many(saved_urls)
+        
+        return len(saved_urls)
+    
     def crawl_category(self, category, max_subcategories, max_articles):
         """Crawl complete category."""
         stats = {'subcategories': 0, 'articles': 0}
@@ -262,59 +430,33 @@ class NewsScraper:
         print_progress("📂 Crawl chuyên mục chính...", level=1)
         articles = self.get_articles_from_page(category['link'], max_articles)
         
-        for idx, article in enumerate(articles, 1):
-            print_progress(f"📄 Bài {idx}/{len(articles)}: {article['title'][:50]}...", level=2)
-            
-            content, metadata = self.get_article_content(article['link'])
-            
-            if content:
-                full_metadata = {**metadata, **article}
-                success = self.storage.save_article(
-                    article_content=content,
-                    title=article['title'],
-                    url=article['link'],
-                    metadata=full_metadata,
-                    category=category['title'],
-                    subcategory=None
-                )
-                if success:
-                    stats['articles'] += 1
-            
-            time.sleep(DELAY_BETWEEN_REQUESTS)
-        
         # Subcategories
         subcategories = self.get_subcategories(category['link'])
         if max_subcategories:
             subcategories = subcategories[:max_subcategories]
         
-        for sub in subcategories:
+        # Listing pages are fetched concurrently, consumed in order
+        listings = self.executor.map(
+            lambda sub: self.get_articles_from_page(sub['link'], max_articles),
+            subcategories
+        )
+        
+        # Schedule main-category articles first, then subcategories; each URL once
+        tasks = [(article, None) for article in articles]
+        scheduled = {article['link'] for article in articles}
+        
+        for sub, sub_articles in zip(subcategories, listings):
             print_progress(f"📁 Chuyên mục con: {sub['title']}", level=1)
             
-            sub_articles = self.get_articles_from_page(sub['link'], max_articles)
-            
-            for idx, article in enumerate(sub_articles, 1):
-                print_progress(f"📄 Bài {idx}/{len(sub_articles)}: {article['title'][:50]}...", level=2)
-                
-                content, metadata = self.get_article_content(article['link'])
-                
-                if content:
-                    full_metadata = {**metadata, **article}
-                    success = self.storage.save_article(
-                        article_content=content,
-                        title=article['title'],
-                        url=article['link'],
-                        metadata=full_metadata,
-                        category=category['title'],
-                        subcategory=sub['title']
-                    )
-                    if success:
-                        stats['articles'] += 1
-                
-                time.sleep(DELAY_BETWEEN_REQUESTS)
+            for article in sub_articles:
+                if article['link'] not in scheduled:
+                    scheduled.add(article['link'])
+                    tasks.append((article, sub['title']))
             
             if sub_articles:
                 stats['subcategories'] += 1
-            
-            time.sleep(DELAY_BETWEEN_SUBCATEGORIES)
         
-        return stats
\ No newline at end of file
+        # Drain all article fetches through one queue
+        stats['articles'] = self._crawl_articles(tasks, category['title'])
+        
+        return stats
@@ -1,14 +1,30 @@
 """Article storage with category mapping"""
 
+import re
 import json
 import logging
+import sqlite3
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from src.crawling.config import ARTICLE_DIR, METADATA_DIR, CATEGORY_DIR, SUB_CATEGORY_DIR
 from src.crawling.utils import create_directory, get_crawl_datetime, CategoryMapper
 
 logger = logging.getLogger(__name__)
 
+_INDEX_RE = re.compile(r'^(?:article|metadata)_(\d+)\.(?:txt|json)$')
+
+
+def _dump_json(data):
+    """Serialize to indented UTF-8 JSON bytes (orjson when available)."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+
 
 class ArticleStorage:
     """Manage article storage with normalized category names."""
@@ -17,31 +33,62 @@ class ArticleStorage:
         self.base_dir = create_directory(base_dir)
         self.category_counters = {}
         self.category_mapper = CategoryMapper()
+        self._category_names = {}
+        self._known_dirs = set()
         logger.info(f"ArticleStorage initialized: {base_dir}")
     
-    def _get_next_index(self, category, subcategory=None):
-        """Get next article index."""
-        key = f"{category}::{subcategory}" if subcategory else category
+    def _get_next_index(self, article_dir, metadata_dir):
+        """Get next article index, continuing after files from earlier runs."""
+        key = article_dir
         if key not in self.category_counters:
-            self.category_counters[key] = 0
+            self.category_counters[key] = self._max_existing_index(article_dir, metadata_dir)
         self.category_counters[key] += 1
         return self.category_counters[key]
     
-    def save_article(self, article_content, title, url, metadata, category, subcategory=None):
+    @staticmethod
+    def _max_existing_index(*dirs):
+        """Highest article/metadata index already on disk (0 if none)."""
+        highest = 0
+        for directory in dirs:
+            for path in directory.iterdir():
+                match = _INDEX_RE.match(path.name)
+                if match:
+                    highest = max(highest, int(match.group(1)))
+        return highest
+    
+    def _ensure_dir(self, path):
+        """Create directory once per storage instance."""
+        if path not in self._known_dirs:
+            create_directory(path)
+            self._known_dirs.add(path)
+        return path
+    
+    def _resolve_name(self, name):
+        """Get cached (normalized, display) names for a category."""
+        if name not in self._category_names:
+            normalized = self.category_mapper.get_normalized_name(name)
+            self._category_names[name] = (normalized, self.category_mapper.get_display_name(normalized))
+        return self._category_names[name]
+    
+    def save_batch(self, articles):
+        """Save a batch of articles given as save_article kwargs."""
+        crawl_date = get_crawl_datetime()
+        return [self.save_article(**article, crawl_date=crawl_date) for article in articles]
+    
+    def flush(self):
+        """Persist category mappings; call once at the end of a crawl."""
+        self.category_mapper.save_mappings()
+    
+    def save_article(self, article_content, title, url, metadata, category, subcategory=None, crawl_date=None):
         """Save article with normalized category names."""
         try:
             # Normalize names
-            category_normalized = self.category_mapper.get_normalized_name(category)
-            category_display = self.category_mapper.get_display_name(category_normalized)
+            category_normalized, category_display = self._resolve_name(category)
             
             subcategory_normalized = None
             subcategory_display = None
             if subcategory:
-                subcategory_normalized = self.category_mapper.get_normalized_name(subcategory)
-                subcategory_display = self.category_mapper.get_display_name(subcategory_normalized)
-            
-            # Save mappings
-            self.category_mapper.save_mappings()
+                subcategory_normalized, subcategory_display = self._resolve_name(subcategory)
             
             # Determine path
             if subcategory_normalized:
@@ -50,11 +97,11 @@ class ArticleStorage:
                 base_path = self.base_dir / category_normalized / CATEGORY_DIR
             
             # Create directories
-            article_dir = create_directory(base_path / ARTICLE_DIR)
-            metadata_dir = create_directory(base_path / METADATA_DIR)
+            article_dir = self._ensure_dir(base_path / ARTICLE_DIR)
+            metadata_dir = self._ensure_dir(base_path / METADATA_DIR)
             
             # Get index
-            index = self._get_next_index(category, subcategory)
+            index = self._get_next_index(article_dir, metadata_dir)
             
             # Save article
             article_file = article_dir / f"article_{index}.txt"
@@ -72,17 +119,42 @@ class ArticleStorage:
                 'subcategory_display': subcategory_display,
                 'title': title,
                 'url': url,
-                'crawl_date': get_crawl_datetime(),
+                'crawl_date': crawl_date or get_crawl_datetime(),
                 **metadata
             }
             
             metadata_file = metadata_dir / f"metadata_{index}.json"
-            with open(metadata_file, 'w', encoding='utf-8') as f:
-                json.dump(metadata_full, f, ensure_ascii=False, indent=2)
+            metadata_file.write_bytes(_dump_json(metadata_full))
             
-            logger.info(f"✓ Saved article {index}: {category_normalized}")
+            logger.info("✓ Saved article %d: %s", index, category_normalized)
             return True
             
         except Exception as e:
-            logger.error(f"✗ Error saving article: {e}")
-            return False
\ No newline at end of file
+            logger.error("✗ Error saving article: %s", e)
+            return False
+
+
+class SeenUrlStore:
+    """Persist crawled article URLs across runs."""
+    
+    def __init__(self, db_file):
+        create_directory(Path(db_file).parent)
+        self.conn = sqlite3.connect(db_file)
+        self.conn.execute('CREATE TABLE IF NOT EXISTS seen (url TEXT PRIMARY KEY, crawled_at INTEGER)')
+        logger.info(f"SeenUrlStore initialized: {db_file}")
+    
+    def contains(self, url):
+        """Check whether URL was already crawled."""
+        return self.conn.execute('SELECT 1 FROM seen WHERE url = ?', (url,)).fetchone() is not None
+    
+    def add_many(self, urls):
+        """Record crawled URLs in one transaction."""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO seen (url, crawled_at) VALUES (?, strftime('%s', 'now'))",
+                ((url,) for url in urls)
+            )
+    
+    def close(self):
+        """Close database connection."""
+        self.conn.close()
\ No newline at end of file
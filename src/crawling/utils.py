@@ -2,13 +2,29 @@
 
 import re
 import csv
+import time
 import logging
+import threading
 import unicodedata
+from collections import namedtuple
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime
 
+from src.crawling.config import CONFIG
+
 logger = logging.getLogger(__name__)
 
+# Precompiled patterns
+_NON_WORD_RE = re.compile(r'\W+')
+_UNDERSCORE_RE = re.compile(r'_{2,}')
+_SANITIZE_RE = re.compile(r'[\x00-\x1F\\/:*?"<>|]')
+_DATE_RE = re.compile(r'\d{1,2}/\d{1,2}/\d{4}')
+
+# Combining diacritical marks (NFD) plus đ/Đ, stripped in one translate pass
+_ACCENT_TABLE = dict.fromkeys(range(0x0300, 0x0370))
+_ACCENT_TABLE.update({ord('đ'): 'd', ord('Đ'): 'D'})
+
 
 # ==================== LOGGING ====================
 
@@ -38,16 +54,10 @@ def remove_vietnamese_accents(text):
     if not text:
         return text
     
-    text = unicodedata.normalize('NFD', text)
-    text = ''.join(char for char in text if unicodedata.category(char) != 'Mn')
-    
-    vietnamese_map = {'đ': 'd', 'Đ': 'D'}
-    for viet_char, latin_char in vietnamese_map.items():
-        text = text.replace(viet_char, latin_char)
-    
-    return text
+    return unicodedata.normalize('NFD', text).translate(_ACCENT_TABLE)
 
 
+@lru_cache(maxsize=2048)
 def normalize_category_name(name):
     """Normalize category name: 'Chính trị' -> 'chinh_tri'"""
     if not name:
@@ -55,22 +65,27 @@ def normalize_category_name(name):
     
     name = name.lower()
     name = remove_vietnamese_accents(name)
-    name = re.sub(r'[^\w\s]', ' ', name)
-    name = re.sub(r'\s+', ' ', name).strip()
-    name = name.replace(' ', '_')
-    name = re.sub(r'_{2,}', '_', name)
+    name = _NON_WORD_RE.sub('_', name)
+    name = _UNDERSCORE_RE.sub('_', name).strip('_')
     
     return name
 
 
 # ==================== CATEGORY MAPPING ====================
 
+CategoryMapping = namedtuple('CategoryMapping', ['original_name', 'display_name'])
+
+
 class CategoryMapper:
     """Manage category name mappings."""
     
     def __init__(self, mapping_file='data/category_mapping.csv'):
         self.mapping_file = Path(mapping_file)
         self.mappings = {}
+        self._header = ['normalized_name', 'original_name', 'display_name']
+        self._extra_columns = {}
+        self._dirty = False
+        self._load_failed = False
         self.mapping_file.parent.mkdir(parents=True, exist_ok=True)
         self.load_mappings()
     
@@ -81,30 +96,41 @@ class CategoryMapper:
         
         try:
             with open(self.mapping_file, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
+                reader = csv.reader(f)
+                header = next(reader, None)
+                if header:
+                    self._header = header
                 for row in reader:
-                    self.mappings[row['normalized_name']] = {
-                        'original_name': row['original_name'],
-                        'display_name': row['display_name']
-                    }
+                    if not row:
+                        continue
+                    # Extra columns (e.g. url_slug) are kept as-is for save
+                    normalized, original, display, *rest = row
+                    self.mappings[normalized] = CategoryMapping(original, display)
+                    self._extra_columns[normalized] = rest
             logger.info(f"Loaded {len(self.mappings)} category mappings")
         except Exception as e:
+            # Never overwrite a file we could not read
+            self._load_failed = True
             logger.error(f"Error loading mappings: {e}")
     
     def save_mappings(self):
-        """Save mappings to CSV."""
+        """Save mappings to CSV if any were added since last save."""
+        if not self._dirty:
+            return
+        if self._load_failed:
+            logger.error(f"Not saving mappings: {self.mapping_file} failed to load")
+            return
+        
+        padding = [''] * (len(self._header) - 3)
         try:
             with open(self.mapping_file, 'w', encoding='utf-8', newline='') as f:
-                fieldnames = ['normalized_name', 'original_name', 'display_name']
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                
-                for normalized, data in sorted(self.mappings.items()):
-                    writer.writerow({
-                        'normalized_name': normalized,
-                        'original_name': data['original_name'],
-                        'display_name': data['display_name']
-                    })
+                writer = csv.writer(f, lineterminator='\n')
+                writer.writerow(self._header)
+                writer.writerows(
+                    (normalized, *mapping, *self._extra_columns.get(normalized, padding))
+                    for normalized, mapping in sorted(self.mappings.items())
+                )
+            self._dirty = False
             logger.info(f"Saved {len(self.mappings)} mappings")
         except Exception as e:
             logger.error(f"Error saving mappings: {e}")
@@ -114,10 +140,10 @@ class CategoryMapper:
         normalized = normalize_category_name(original_name)
         display_name = original_name.upper()
         
-        self.mappings[normalized] = {
-            'original_name': original_name,
-            'display_name': display_name
-        }
+        entry = CategoryMapping(original_name, display_name)
+        if self.mappings.get(normalized) != entry:
+            self.mappings[normalized] = entry
+            self._dirty = True
         
         return normalized
     
@@ -130,28 +156,62 @@ class CategoryMapper:
     
     def get_display_name(self, normalized):
         """Get display name."""
-        return self.mappings.get(normalized, {}).get('display_name', normalized.upper())
+        mapping = self.mappings.get(normalized)
+        return mapping.display_name if mapping else normalized.upper()
+
+
+# ==================== RATE LIMITING ====================
+
+class RateLimiter:
+    """Thread-safe token bucket limiting requests per second."""
+    
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a request slot is available."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
 
 
 # ==================== URL & FILE UTILS ====================
 
+@lru_cache(maxsize=4096)
 def normalize_url(link, base_url):
     """Normalize URL."""
     if not link:
         return None
-    if link.startswith('http'):
+    if link.startswith(('http://', 'https://')):
         return link
     
-    link = re.sub(r'^\.+/', '', link)
+    if link.startswith('.'):
+        stripped = link.lstrip('.')
+        if stripped.startswith('/'):
+            link = stripped[1:]
     if link.startswith('/'):
         return base_url + link
     return base_url + '/' + link
 
 
+@lru_cache(maxsize=4096)
 def sanitize_filename(name):
     """Sanitize filename."""
-    sanitized = re.sub(r'[\x00-\x1F\\/:*?"<>|]', '_', name).strip()
-    sanitized = re.sub(r'_{2,}', '_', sanitized)
+    sanitized = _SANITIZE_RE.sub('_', name).strip()
+    sanitized = _UNDERSCORE_RE.sub('_', sanitized)
     return sanitized[:100]
 
 
@@ -166,7 +226,7 @@ def extract_date_from_text(text):
     """Extract date from text."""
     if not text:
         return None
-    match = re.search(r'\d{1,2}/\d{1,2}/\d{4}', text)
+    match = _DATE_RE.search(text)
     return match.group(0) if match else None
 
 
@@ -184,5 +244,7 @@ def print_separator():
 
 def print_progress(message, level=0):
     """Print progress with indentation."""
+    if CONFIG.quiet:
+        return
     indent = "  " * level
     print(f"{indent}{message}")
\ No newline at end of file